@@ -82,10 +82,10 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'orders.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'orders.parsers.FastJSONParser',
     ],
     'DEFAULT_RESPONSE_CLASS': 'rest_framework.response.Response',
 }
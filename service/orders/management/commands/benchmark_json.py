@@ -0,0 +1,126 @@
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from orders import parsers, renderers
+from orders.models import Order
+from orders.parsers import FastJSONParser
+from orders.renderers import FastJSONRenderer
+from orders.serializers import OrderSerializer
+
+from .benchmark_orders import item_payload, seed_orders, summarize
+
+
+class Command(BaseCommand):
+	help = 'Compare FastJSONRenderer/FastJSONParser with the DRF defaults on order payloads, emitting JSON results'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--orders', type=int, default=1000,
+		                    help='Number of orders in the list payload')
+		parser.add_argument('--min-items', type=int, default=1)
+		parser.add_argument('--max-items', type=int, default=5)
+		parser.add_argument('--iterations', type=int, default=20,
+		                    help='Measured runs per scenario and implementation')
+		parser.add_argument('--seed', type=int, default=0)
+		parser.add_argument('--output', help='Write results to this file instead of stdout')
+
+	def handle(self, *args, **options):
+		if options['orders'] < 1 or options['iterations'] < 1:
+			raise CommandError('--orders and --iterations must be positive')
+
+		rng = random.Random(options['seed'])
+		# Payloads come from the real serializer; the seeded rows are rolled back.
+		with transaction.atomic():
+			seed_orders(options['orders'], options['min_items'], options['max_items'], rng)
+			orders = Order.objects.prefetch_related('items').order_by('id')
+			list_data = OrderSerializer(orders, many=True).data
+			detail_data = OrderSerializer(orders.first()).data
+			transaction.set_rollback(True)
+
+		create_body = json.dumps({
+			'customer_id': 1,
+			'customer_email': 'customer@example.com',
+			'customer_name': 'Иван Петров',
+			'delivering_address': 'ул. Ленина, 1',
+			'delivering_city': 'Москва',
+			'items': item_payload(rng, 20),
+		}).encode()
+		list_body = JSONRenderer().render(list_data)
+
+		results = {
+			'render_list': self._compare_render(list_data, options['iterations']),
+			'render_detail': self._compare_render(detail_data, options['iterations'] * 100),
+			'parse_list': self._compare_parse(list_body, options['iterations']),
+			'parse_create': self._compare_parse(create_body, options['iterations'] * 100),
+		}
+
+		report = {
+			'timestamp': timezone.now().isoformat(),
+			'environment': {
+				'python': platform.python_version(),
+				'renderer_backend': renderers.BACKEND,
+				'parser_backend': parsers.BACKEND,
+			},
+			'dataset': {
+				'orders': options['orders'],
+				'min_items': options['min_items'],
+				'max_items': options['max_items'],
+				'seed': options['seed'],
+				'list_bytes': len(list_body),
+			},
+			'scenarios': results,
+		}
+		output = json.dumps(report, indent=2)
+		if options['output']:
+			with open(options['output'], 'w', encoding='utf-8') as f:
+				f.write(output + '\n')
+		else:
+			sys.stdout.write(output + '\n')
+
+	def _compare_render(self, data, iterations):
+		baseline, fast = JSONRenderer(), FastJSONRenderer()
+		if baseline.render(data, 'application/json') != fast.render(data, 'application/json'):
+			raise CommandError('FastJSONRenderer output differs from JSONRenderer')
+		return self._compare(
+			lambda: baseline.render(data, 'application/json'),
+			lambda: fast.render(data, 'application/json'),
+			iterations,
+		)
+
+	def _compare_parse(self, body, iterations):
+		baseline, fast = JSONParser(), FastJSONParser()
+		if baseline.parse(io.BytesIO(body)) != fast.parse(io.BytesIO(body)):
+			raise CommandError('FastJSONParser result differs from JSONParser')
+		return self._compare(
+			lambda: baseline.parse(io.BytesIO(body)),
+			lambda: fast.parse(io.BytesIO(body)),
+			iterations,
+		)
+
+	def _compare(self, baseline, fast, iterations):
+		results = {
+			'stdlib': summarize(self._time(baseline, iterations)),
+			'fast': summarize(self._time(fast, iterations)),
+		}
+		results['speedup'] = round(
+			results['stdlib']['latency_ms']['mean'] / results['fast']['latency_ms']['mean'], 2
+		)
+		return results
+
+	def _time(self, call, iterations):
+		call()
+		durations = []
+		for _ in range(iterations):
+			started = time.perf_counter()
+			call()
+			durations.append(time.perf_counter() - started)
+		return durations
@@ -0,0 +1,277 @@
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+
+
+BENCH_PREFIX = 'BENCH-'
+BENCH_EMAIL_DOMAIN = 'bench.example.com'
+COUNTRIES = ['Russia', 'Russia', 'Russia', 'Kazakhstan', 'Belarus']
+CITIES = ['Moscow', 'Saint Petersburg', 'Kazan', 'Novosibirsk', 'Yekaterinburg']
+
+
+def seed_orders(count, min_items, max_items, rng, status='pending', payment_status='pending', start=0):
+	"""
+	Insert ``count`` synthetic orders with a uniform number of items in
+	``[min_items, max_items]`` per order and return them.
+	"""
+	now = timezone.now()
+	orders = Order.objects.bulk_create([
+		Order(
+			order_number=f'{BENCH_PREFIX}{start + index:08d}',
+			customer_id=rng.randint(1, max(count // 5, 1)),
+			customer_email=f'customer{start + index}@{BENCH_EMAIL_DOMAIN}',
+			customer_name=f'Customer {start + index}',
+			status=status,
+			payment_status=payment_status,
+			delivering_address=f'Lenina {rng.randint(1, 200)}',
+			delivering_city=rng.choice(CITIES),
+			delivering_country=rng.choice(COUNTRIES),
+			delivering_cost=Decimal(rng.randint(0, 50000)) / 100,
+			created_at=now,
+			updated_at=now,
+		)
+		for index in range(count)
+	], batch_size=1000)
+
+	items = []
+	for order in orders:
+		order.subtotal = Decimal(0)
+		for _ in range(rng.randint(min_items, max_items)):
+			item = random_item(rng)
+			item.order = order
+			order.subtotal += item.quantity * item.unit_price
+			items.append(item)
+	OrderItem.objects.bulk_create(items, batch_size=5000)
+	Order.objects.bulk_update(orders, ['subtotal'], batch_size=1000)
+	return orders
+
+
+def random_item(rng):
+	product_id = rng.randint(1, 10000)
+	return OrderItem(
+		product_id=product_id,
+		product_name=f'Product {product_id}',
+		quantity=rng.randint(1, 5),
+		unit_price=Decimal(rng.randint(100, 1000000)) / 100,
+	)
+
+
+def item_payload(rng, count):
+	return [
+		{
+			'product_id': item.product_id,
+			'product_name': item.product_name,
+			'quantity': item.quantity,
+			'unit_price': str(item.unit_price),
+		}
+		for item in (random_item(rng) for _ in range(count))
+	]
+
+
+def summarize(durations):
+	durations = sorted(durations)
+	total = sum(durations)
+	quantiles = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+	return {
+		'requests': len(durations),
+		'throughput_rps': round(len(durations) / total, 2) if total else None,
+		'latency_ms': {
+			'mean': round(statistics.fmean(durations) * 1000, 3),
+			'min': round(durations[0] * 1000, 3),
+			'p50': round(quantiles[49] * 1000, 3),
+			'p95': round(quantiles[94] * 1000, 3),
+			'p99': round(quantiles[98] * 1000, 3),
+			'max': round(durations[-1] * 1000, 3),
+		},
+	}
+
+
+class Command(BaseCommand):
+	help = 'Seed a synthetic dataset and benchmark OrderViewSet endpoints, emitting JSON results'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--orders', type=int, default=1000,
+		                    help='Number of orders to seed')
+		parser.add_argument('--min-items', type=int, default=1)
+		parser.add_argument('--max-items', type=int, default=5)
+		parser.add_argument('--iterations', type=int, default=50,
+		                    help='Measured requests per scenario')
+		parser.add_argument('--warmup', type=int, default=5,
+		                    help='Unmeasured requests per scenario')
+		parser.add_argument('--seed', type=int, default=0,
+		                    help='Random seed, fixes the dataset and the request sequence')
+		parser.add_argument('--scenario', action='append', dest='scenarios',
+		                    help='Run only the given scenario, may be repeated')
+		parser.add_argument('--output', help='Write results to this file instead of stdout')
+		parser.add_argument('--keep', action='store_true',
+		                    help='Keep the seeded orders after the run')
+
+	def handle(self, *args, **options):
+		if options['orders'] < 1 or options['iterations'] < 1:
+			raise CommandError('--orders and --iterations must be positive')
+		if not 0 <= options['min_items'] <= options['max_items']:
+			raise CommandError('Expected 0 <= --min-items <= --max-items')
+
+		scenarios = {
+			'list': self._list,
+			'filtered_list': self._filtered_list,
+			'search': self._search,
+			'retrieve': self._retrieve,
+			'create_with_items': self._create_with_items,
+			'update_items': self._update_items,
+			'update_status': self._update_status,
+		}
+		selected = options['scenarios'] or list(scenarios)
+		unknown = set(selected) - set(scenarios)
+		if unknown:
+			raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+		bench_orders = Order.objects.filter(customer_email__endswith=f'@{BENCH_EMAIL_DOMAIN}')
+		if bench_orders.exists():
+			raise CommandError(f'Orders of {BENCH_EMAIL_DOMAIN} customers already exist, remove them first')
+
+		self.rng = random.Random(options['seed'])
+		self.options = options
+		self.client = APIClient()
+
+		try:
+			started = time.perf_counter()
+			self.orders = seed_orders(options['orders'], options['min_items'], options['max_items'], self.rng)
+			self.stderr.write(f'Seeded {options["orders"]} orders in {time.perf_counter() - started:.1f}s')
+
+			results = {}
+			for name in selected:
+				self.stderr.write(f'Running {name}')
+				results[name] = scenarios[name]()
+		finally:
+			if not options['keep']:
+				bench_orders.delete()
+
+		report = {
+			'timestamp': timezone.now().isoformat(),
+			'environment': {
+				'python': platform.python_version(),
+				'django': django.get_version(),
+				'database': connection.vendor,
+			},
+			'dataset': {
+				'orders': options['orders'],
+				'min_items': options['min_items'],
+				'max_items': options['max_items'],
+				'seed': options['seed'],
+			},
+			'iterations': options['iterations'],
+			'scenarios': results,
+		}
+		output = json.dumps(report, indent=2)
+		if options['output']:
+			with open(options['output'], 'w', encoding='utf-8') as f:
+				f.write(output + '\n')
+		else:
+			sys.stdout.write(output + '\n')
+
+	def _measure(self, request, expected_status):
+		"""
+		Call ``request(index)`` for warmup and measured iterations. It must
+		return a response; timings and query counts are only kept for the
+		measured ones.
+		"""
+		for index in range(self.options['warmup']):
+			self._check(request(index), expected_status)
+
+		durations, queries = [], []
+		for index in range(self.options['warmup'], self.options['warmup'] + self.options['iterations']):
+			with CaptureQueriesContext(connection) as captured:
+				started = time.perf_counter()
+				response = request(index)
+				durations.append(time.perf_counter() - started)
+			self._check(response, expected_status)
+			queries.append(len(captured))
+		return {**summarize(durations), 'queries_per_request': max(queries)}
+
+	def _check(self, response, expected_status):
+		if response.status_code != expected_status:
+			raise CommandError(f'Unexpected response {response.status_code}: {response.content[:500]!r}')
+
+	def _pending_orders(self, count):
+		"""Fresh pending orders for scenarios that change order state."""
+		start = Order.objects.filter(order_number__startswith=BENCH_PREFIX).count()
+		return seed_orders(count, self.options['min_items'], self.options['max_items'], self.rng, start=start)
+
+	def _total_runs(self):
+		return self.options['warmup'] + self.options['iterations']
+
+	def _list(self):
+		url = reverse('order-list')
+		return self._measure(lambda index: self.client.get(url), 200)
+
+	def _filtered_list(self):
+		url = reverse('order-list')
+		return self._measure(
+			lambda index: self.client.get(url, {
+				'status': 'pending',
+				'delivering_country': COUNTRIES[index % len(COUNTRIES)],
+			}),
+			200,
+		)
+
+	def _search(self):
+		url = reverse('order-list')
+		return self._measure(
+			lambda index: self.client.get(url, {'search': f'Customer {self.rng.randrange(len(self.orders))}'}),
+			200,
+		)
+
+	def _retrieve(self):
+		return self._measure(
+			lambda index: self.client.get(reverse('order-detail', args=[self.rng.choice(self.orders).pk])),
+			200,
+		)
+
+	def _create_with_items(self):
+		url = reverse('order-list')
+		return self._measure(
+			lambda index: self.client.post(url, {
+				'customer_id': self.rng.randint(1, 1000),
+				'customer_email': f'created{index}@{BENCH_EMAIL_DOMAIN}',
+				'customer_name': f'Created {index}',
+				'delivering_address': 'Lenina 1',
+				'delivering_city': 'Moscow',
+				'items': item_payload(self.rng, self.rng.randint(self.options['min_items'], self.options['max_items'])),
+			}, format='json'),
+			201,
+		)
+
+	def _update_items(self):
+		orders = self._pending_orders(self._total_runs())
+		return self._measure(
+			lambda index: self.client.patch(reverse('order-detail', args=[orders[index].pk]), {
+				'items': item_payload(self.rng, self.rng.randint(self.options['min_items'], self.options['max_items'])),
+			}, format='json'),
+			200,
+		)
+
+	def _update_status(self):
+		orders = self._pending_orders(self._total_runs())
+		return self._measure(
+			lambda index: self.client.patch(
+				reverse('order-update-status', args=[orders[index].pk]),
+				{'status': 'processing'},
+				format='json',
+			),
+			200,
+		)
@@ -0,0 +1,407 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import ProhibitNullCharactersValidator
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from orders.validators import validate_order_state
+
+
+ORDER_FIELDS = [
+	f for f in Order._meta.concrete_fields
+	if f.name not in ('id', 'subtotal')
+]
+ITEM_FIELDS = [
+	f for f in OrderItem._meta.concrete_fields
+	if f.name not in ('id', 'order')
+]
+ITEM_PREFIX = 'item_'
+
+
+class InvalidRecord(Exception):
+	"""
+	Input that cannot be parsed into an order. Readers yield it in place of
+	the record so the command can report or skip it like a validation error.
+	"""
+
+
+def _copy_value(value):
+	if value is None:
+		return '\\N'
+	if hasattr(value, 'isoformat'):
+		value = value.isoformat()
+	return (
+		str(value)
+		.replace('\\', '\\\\')
+		.replace('\t', '\\t')
+		.replace('\n', '\\n')
+		.replace('\r', '\\r')
+	)
+
+
+def _copy_row(values):
+	return '\t'.join(_copy_value(value) for value in values) + '\n'
+
+
+def read_ndjson(stream):
+	for line_number, line in enumerate(stream, start=1):
+		line = line.strip()
+		if not line:
+			continue
+		try:
+			record = json.loads(line, parse_float=Decimal)
+		except ValueError as e:
+			yield InvalidRecord(f'line {line_number}: {e}')
+			continue
+		if not isinstance(record, dict):
+			yield InvalidRecord(f'line {line_number}: expected a JSON object')
+			continue
+		items = record.pop('items', None) or []
+		yield record, items
+
+
+def read_csv(stream):
+	"""
+	One row per order item, order columns repeated on every row and item
+	columns prefixed with ``item_``. Rows of one order must be adjacent,
+	a later group with the same order number is reported as a duplicate;
+	an order without items is a single row with empty item columns.
+	"""
+	order, items = None, []
+	reader = csv.DictReader(stream)
+	for row in reader:
+		if None in row:
+			if order is not None:
+				yield order, items
+				order, items = None, []
+			yield InvalidRecord(f'line {reader.line_num}: more fields than in the header')
+			continue
+
+		order_data, item_data = {}, {}
+		for key, value in row.items():
+			if value in ('', None):
+				continue
+			if key.startswith(ITEM_PREFIX):
+				item_data[key[len(ITEM_PREFIX):]] = value
+			else:
+				order_data[key] = value
+
+		if order is not None and order.get('order_number') != order_data.get('order_number'):
+			yield order, items
+			order, items = None, []
+		if order is None:
+			order = order_data
+		if item_data:
+			items.append(item_data)
+
+	if order is not None:
+		yield order, items
+
+
+READERS = {
+	'csv': read_csv,
+	'ndjson': read_ndjson,
+}
+
+
+def validate_no_null_characters(data):
+	"""
+	PostgreSQL text cannot hold NUL, and model fields do not check for it
+	the way the API's serializer fields do.
+	"""
+	validator = ProhibitNullCharactersValidator()
+	errors = []
+	for name, value in data.items():
+		if isinstance(value, str):
+			try:
+				validator(value)
+			except ValidationError as e:
+				errors.extend(f'{name}: {message}' for message in e.messages)
+	if errors:
+		raise ValidationError(errors)
+
+
+def build_order(data):
+	known = {f.name for f in ORDER_FIELDS}
+	unknown = set(data) - known
+	if unknown:
+		raise ValidationError(f'Unknown order fields: {", ".join(sorted(unknown))}')
+	validate_no_null_characters(data)
+	if not data.get('order_number'):
+		raise ValidationError('order_number is required for import')
+
+	order = Order(**data)
+	order.clean_fields(exclude=['id', 'subtotal'])
+	validate_order_state(order.status, order.payment_status)
+
+	for field in ORDER_FIELDS:
+		value = getattr(order, field.attname)
+		if field.get_internal_type() == 'DateTimeField' and value is not None:
+			if timezone.is_naive(value):
+				setattr(order, field.attname, timezone.make_aware(value))
+	if order.created_at is None:
+		order.created_at = timezone.now()
+	if order.updated_at is None:
+		order.updated_at = order.created_at
+	return order
+
+
+def build_item(data):
+	known = {f.name for f in ITEM_FIELDS}
+	unknown = set(data) - known
+	if unknown:
+		raise ValidationError(f'Unknown item fields: {", ".join(sorted(unknown))}')
+	validate_no_null_characters(data)
+
+	item = OrderItem(**data)
+	item.clean_fields(exclude=['id', 'order'])
+	return item
+
+
+def validate_subtotal(items):
+	"""
+	Check the subtotal the import will compute for these items against the
+	subtotal column, so an overflow is reported for the order instead of
+	failing the whole chunk in the database.
+	"""
+	subtotal = sum((item.quantity * item.unit_price for item in items), Decimal(0))
+	try:
+		Order._meta.get_field('subtotal').run_validators(subtotal)
+	except ValidationError as e:
+		raise ValidationError([f'subtotal {subtotal}: {message}' for message in e.messages])
+	return subtotal
+
+
+class Command(BaseCommand):
+	help = 'Bulk import orders with their items from CSV or NDJSON using PostgreSQL COPY'
+
+	def add_arguments(self, parser):
+		parser.add_argument('path', help='Input file, or "-" to read from stdin')
+		parser.add_argument('--format', choices=sorted(READERS), dest='input_format')
+		parser.add_argument('--chunk-size', type=int, default=5000,
+		                    help='Number of orders loaded per transaction')
+		parser.add_argument('--checkpoint',
+		                    help='Progress file, defaults to <path>.checkpoint')
+		parser.add_argument('--resume', action='store_true',
+		                    help='Skip orders already committed according to the checkpoint')
+		parser.add_argument('--skip-invalid', action='store_true',
+		                    help='Report invalid or unparsable orders and continue instead of stopping')
+
+	def handle(self, *args, **options):
+		if connection.vendor != 'postgresql':
+			raise CommandError('import_orders requires a PostgreSQL database')
+		if options['chunk_size'] < 1:
+			raise CommandError('--chunk-size must be positive')
+
+		path = options['path']
+		input_format = options['input_format'] or self._guess_format(path)
+		checkpoint = options['checkpoint'] or (None if path == '-' else f'{path}.checkpoint')
+		if options['resume'] and not checkpoint:
+			raise CommandError('--resume needs --checkpoint when reading from stdin')
+
+		offset = self._read_checkpoint(checkpoint) if options['resume'] else 0
+		try:
+			stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+		except OSError as e:
+			raise CommandError(f'Cannot open {path}: {e.strerror}')
+		try:
+			records = READERS[input_format](stream)
+			self._import(records, offset, checkpoint, options)
+		finally:
+			if stream is not sys.stdin:
+				stream.close()
+
+		if checkpoint and os.path.exists(checkpoint):
+			os.remove(checkpoint)
+
+	def _import(self, records, offset, checkpoint, options):
+		# Order numbers read so far, including the ones committed before a
+		# resume: a repeated number means the rows of one order are not
+		# adjacent, and the later group must not be mistaken for an order
+		# that is already present.
+		seen = set()
+		if offset:
+			self.stdout.write(f'Resuming after {offset} orders')
+			for record in islice(records, offset):
+				if not isinstance(record, InvalidRecord):
+					self._remember(seen, record[0])
+
+		processed = offset
+		totals = {'orders': 0, 'items': 0, 'skipped': 0, 'invalid': 0}
+		started = time.monotonic()
+
+		while True:
+			chunk = list(islice(records, options['chunk_size']))
+			if not chunk:
+				break
+
+			orders, items, invalid = self._validate_chunk(chunk, processed, seen, options['skip_invalid'])
+			with transaction.atomic():
+				inserted, item_count = self._load_chunk(orders, items)
+
+			processed += len(chunk)
+			if checkpoint:
+				self._write_checkpoint(checkpoint, processed)
+
+			totals['orders'] += inserted
+			totals['items'] += item_count
+			totals['skipped'] += len(orders) - inserted
+			totals['invalid'] += invalid
+			elapsed = max(time.monotonic() - started, 1e-6)
+			self.stdout.write(
+				f'{processed} orders read: {totals["orders"]} imported, '
+				f'{totals["items"]} items, {totals["skipped"]} already present, '
+				f'{totals["invalid"]} invalid ({(processed - offset) / elapsed:.0f} orders/s)'
+			)
+
+		self.stdout.write(self.style.SUCCESS(
+			f'Imported {totals["orders"]} orders with {totals["items"]} items'
+		))
+
+	def _validate_chunk(self, chunk, processed, seen, skip_invalid):
+		orders, items = [], []
+		invalid = 0
+
+		for position, record in enumerate(chunk, start=processed + 1):
+			if isinstance(record, InvalidRecord):
+				message = f'Order #{position}: malformed input, {record}'
+				if not skip_invalid:
+					raise CommandError(f'{message}. Fix the input and rerun with --resume')
+				self.stderr.write(message)
+				invalid += 1
+				continue
+
+			order_data, items_data = record
+			try:
+				if not self._remember(seen, order_data):
+					raise ValidationError(f'Duplicate order_number {order_data["order_number"]} in input')
+				order = build_order(order_data)
+				order_items = [build_item(item_data) for item_data in items_data]
+				validate_subtotal(order_items)
+			except (ValidationError, TypeError, ValueError) as e:
+				messages = e.messages if isinstance(e, ValidationError) else [str(e)]
+				message = f'Order #{position} ({order_data.get("order_number")}): {"; ".join(messages)}'
+				if not skip_invalid:
+					raise CommandError(f'{message}. Fix the input and rerun with --resume')
+				self.stderr.write(message)
+				invalid += 1
+				continue
+
+			orders.append(order)
+			items.extend((order.order_number, index, item) for index, item in enumerate(order_items))
+
+		return orders, items, invalid
+
+	def _remember(self, seen, order_data):
+		"""Record the order number, returning False if it was read before."""
+		order_number = order_data.get('order_number')
+		if order_number is None:
+			return True
+		order_number = str(order_number)
+		if order_number in seen:
+			return False
+		seen.add(order_number)
+		return True
+
+	def _load_chunk(self, orders, items):
+		order_table = connection.ops.quote_name(Order._meta.db_table)
+		item_table = connection.ops.quote_name(OrderItem._meta.db_table)
+		order_columns = ', '.join(connection.ops.quote_name(f.column) for f in ORDER_FIELDS)
+		item_columns = ', '.join(connection.ops.quote_name(f.column) for f in ITEM_FIELDS)
+		staged_item_columns = ', '.join(f'i.{connection.ops.quote_name(f.column)}' for f in ITEM_FIELDS)
+		order_fk = connection.ops.quote_name(OrderItem._meta.get_field('order').column)
+
+		with connection.cursor() as cursor:
+			cursor.execute(
+				f'CREATE TEMP TABLE import_order ON COMMIT DROP AS '
+				f'SELECT {order_columns} FROM {order_table} WITH NO DATA'
+			)
+			cursor.execute(
+				f'CREATE TEMP TABLE import_item ON COMMIT DROP AS '
+				f'SELECT o.order_number, 0 AS position, {item_columns} '
+				f'FROM {item_table} JOIN {order_table} o ON false WITH NO DATA'
+			)
+			cursor.execute(
+				'CREATE TEMP TABLE import_new_order (id bigint PRIMARY KEY, order_number varchar) '
+				'ON COMMIT DROP'
+			)
+
+			cursor.copy_expert(
+				f'COPY import_order ({order_columns}) FROM STDIN',
+				io.StringIO(''.join(
+					_copy_row(getattr(order, f.attname) for f in ORDER_FIELDS)
+					for order in orders
+				)),
+			)
+			cursor.copy_expert(
+				f'COPY import_item (order_number, position, {item_columns}) FROM STDIN',
+				io.StringIO(''.join(
+					_copy_row([order_number, position, *(getattr(item, f.attname) for f in ITEM_FIELDS)])
+					for order_number, position, item in items
+				)),
+			)
+
+			# Orders that already exist were committed by an earlier run, so
+			# neither they nor their items are touched again.
+			cursor.execute(
+				f'WITH inserted AS ('
+				f'  INSERT INTO {order_table} ({order_columns}, subtotal)'
+				f'  SELECT {order_columns}, 0 FROM import_order'
+				f'  ON CONFLICT (order_number) DO NOTHING'
+				f'  RETURNING id, order_number'
+				f') INSERT INTO import_new_order SELECT id, order_number FROM inserted'
+			)
+			inserted = cursor.rowcount
+
+			cursor.execute(
+				f'INSERT INTO {item_table} ({order_fk}, {item_columns}) '
+				f'SELECT n.id, {staged_item_columns} '
+				f'FROM import_item i JOIN import_new_order n ON n.order_number = i.order_number '
+				f'ORDER BY n.id, i.position'
+			)
+			item_count = cursor.rowcount
+
+			cursor.execute(
+				f'UPDATE {order_table} o SET subtotal = t.subtotal '
+				f'FROM ('
+				f'  SELECT i.{order_fk} AS order_id, SUM(i.quantity * i.unit_price) AS subtotal'
+				f'  FROM {item_table} i JOIN import_new_order n ON n.id = i.{order_fk}'
+				f'  GROUP BY i.{order_fk}'
+				f') t WHERE o.id = t.order_id'
+			)
+
+			# ON COMMIT DROP only fires on a real commit; inside an outer
+			# transaction each chunk is a savepoint and the tables would outlive it.
+			cursor.execute('DROP TABLE import_order, import_item, import_new_order')
+
+		return inserted, item_count
+
+	def _guess_format(self, path):
+		extension = os.path.splitext(path)[1].lstrip('.').lower()
+		if extension in ('json', 'jsonl'):
+			extension = 'ndjson'
+		if extension not in READERS:
+			raise CommandError('Cannot detect input format, pass --format')
+		return extension
+
+	def _read_checkpoint(self, checkpoint):
+		if not os.path.exists(checkpoint):
+			return 0
+		with open(checkpoint, encoding='utf-8') as f:
+			return json.load(f)['orders']
+
+	def _write_checkpoint(self, checkpoint, processed):
+		tmp_path = f'{checkpoint}.tmp'
+		with open(tmp_path, 'w', encoding='utf-8') as f:
+			json.dump({'orders': processed}, f)
+		os.replace(tmp_path, checkpoint)
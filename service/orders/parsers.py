@@ -0,0 +1,44 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer
+
+try:
+	import msgspec
+except ImportError:
+	msgspec = None
+
+
+# orjson is not used here: it turns integers beyond 64 bits into floats.
+if msgspec is not None:
+	BACKEND = 'msgspec'
+	_loads = msgspec.json.Decoder().decode
+else:
+	BACKEND = 'json'
+	_loads = None
+
+
+class FastJSONParser(JSONParser):
+	"""
+	Drop-in JSONParser that decodes UTF-8 bodies with msgspec when it is installed.
+
+	Any body the fast decoder rejects is handed to JSONParser, so error
+	messages and edge cases such as out of range numbers stay the same.
+	"""
+	renderer_class = FastJSONRenderer
+
+	def parse(self, stream, media_type=None, parser_context=None):
+		parser_context = parser_context or {}
+		encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+		if _loads is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+			return super().parse(stream, media_type, parser_context)
+
+		body = stream.read()
+		try:
+			return _loads(body)
+		except ValueError:
+			return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,73 @@
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+_SCALARS = {str, int, bool, type(None)}
+
+
+def _has_non_finite_float(data):
+	stack = [data]
+	while stack:
+		obj = stack.pop()
+		kind = type(obj)
+		if kind in _SCALARS:
+			continue
+		if kind is float:
+			if not math.isfinite(obj):
+				return True
+		elif isinstance(obj, dict):
+			stack.extend(obj.values())
+		elif isinstance(obj, (list, tuple)):
+			stack.extend(obj)
+	return False
+
+
+class FastJSONRenderer(JSONRenderer):
+	"""
+	Drop-in JSONRenderer that encodes with orjson when it is installed.
+
+	Datetimes and every type orjson does not know natively are passed to
+	DRF's JSONEncoder, so decimals and timestamps render byte for byte as
+	with JSONRenderer. Floats match the stdlib for 1e-4 <= |x| < 1e16,
+	which covers all DecimalFields of the API. Indented or non-compact
+	output, ASCII-only output, non-string keys, integers beyond 64 bits,
+	NaN and infinities, and anything orjson refuses to encode fall back to
+	JSONRenderer.
+	"""
+
+	def render(self, data, accepted_media_type=None, renderer_context=None):
+		if orjson is None or data is None or self._needs_stdlib(accepted_media_type, renderer_context):
+			return super().render(data, accepted_media_type, renderer_context)
+
+		encoder = self.encoder_class()
+
+		def default(obj):
+			value = encoder.default(obj)
+			if _has_non_finite_float(value):
+				raise ValueError('Out of range float values are not JSON compliant')
+			return value
+
+		try:
+			ret = orjson.dumps(data, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+		except orjson.JSONEncodeError:
+			return super().render(data, accepted_media_type, renderer_context)
+
+		# orjson writes NaN and infinities as null where JSONRenderer raises,
+		# so only output without any null can skip the scan.
+		if b'null' in ret and _has_non_finite_float(data):
+			return super().render(data, accepted_media_type, renderer_context)
+
+		return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+	def _needs_stdlib(self, accepted_media_type, renderer_context):
+		if self.ensure_ascii or not self.compact or not self.strict:
+			return True
+		return self.get_indent(accepted_media_type, renderer_context or {}) is not None
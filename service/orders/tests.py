@@ -1,3 +1,458 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import tempfile
+import uuid
+from decimal import Decimal
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from . import parsers, renderers
+from .management.commands.import_orders import (
+	InvalidRecord, build_item, build_order, read_csv, read_ndjson, validate_subtotal,
+)
+from .models import Order, OrderItem
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .validators import validate_order_state
+
+
+class OrderQueryBudgetTests(APITestCase):
+	"""
+	Every endpoint of OrderViewSet has a fixed query budget that must not
+	depend on the number of orders or items involved. Raising a budget here
+	should be a deliberate decision, not a side effect.
+	"""
+
+	@classmethod
+	def setUpTestData(cls):
+		orders = Order.objects.bulk_create([
+			Order(
+				order_number=f'ORD-TEST{index:04d}',
+				customer_id=index,
+				customer_email=f'customer{index}@example.com',
+				customer_name=f'Customer {index}',
+				delivering_address='Lenina 1',
+				delivering_city='Moscow',
+				status='processing' if index % 2 else 'pending',
+				payment_status='paid' if index % 2 else 'pending',
+			)
+			for index in range(10)
+		])
+		OrderItem.objects.bulk_create([
+			OrderItem(
+				order=order,
+				product_id=product_id,
+				product_name=f'Product {product_id}',
+				quantity=2,
+				unit_price=Decimal('10.50'),
+			)
+			for order in orders
+			for product_id in range(3)
+		])
+		cls.pending = orders[0]
+		cls.processing = orders[1]
+
+	def assertBudget(self, budget, method, url, data=None):
+		with self.assertNumQueries(budget):
+			response = getattr(self.client, method)(url, data, format='json')
+		self.assertLess(response.status_code, 400, response.content)
+		return response
+
+	def test_list(self):
+		response = self.assertBudget(2, 'get', reverse('order-list'))
+		self.assertEqual(len(response.data), 10)
+
+	def test_filtered_list(self):
+		self.assertBudget(2, 'get', reverse('order-list'), {'status': 'pending', 'delivering_country': 'Russia'})
+
+	def test_search(self):
+		self.assertBudget(2, 'get', reverse('order-list'), {'search': 'Customer 1'})
+
+	def test_retrieve(self):
+		self.assertBudget(2, 'get', reverse('order-detail', args=[self.pending.pk]))
+
+	def test_items(self):
+		self.assertBudget(2, 'get', reverse('order-items', args=[self.pending.pk]))
+
+	def test_create_with_items(self):
+		self.assertBudget(5, 'post', reverse('order-list'), {
+			'customer_id': 1,
+			'customer_email': 'new@example.com',
+			'customer_name': 'New Customer',
+			'delivering_address': 'Lenina 2',
+			'delivering_city': 'Moscow',
+			'items': [
+				{'product_id': product_id, 'product_name': f'Product {product_id}',
+				 'quantity': 1, 'unit_price': '5.00'}
+				for product_id in range(5)
+			],
+		})
+
+	def test_update(self):
+		self.assertBudget(7, 'put', reverse('order-detail', args=[self.pending.pk]), {
+			'customer_id': 1,
+			'customer_email': 'updated@example.com',
+			'customer_name': 'Updated Customer',
+			'delivering_address': 'Lenina 3',
+			'delivering_city': 'Kazan',
+			'delivering_country': 'Russia',
+			'delivering_cost': '15.00',
+			'notes': 'Leave at the door',
+			'items': [
+				{'product_id': product_id, 'product_name': f'Product {product_id}',
+				 'quantity': 1, 'unit_price': '2.00'}
+				for product_id in range(5)
+			],
+		})
+
+	def test_update_items(self):
+		self.assertBudget(7, 'patch', reverse('order-detail', args=[self.pending.pk]), {
+			'items': [
+				{'product_id': product_id, 'product_name': f'Product {product_id}',
+				 'quantity': 3, 'unit_price': '7.25'}
+				for product_id in range(5)
+			],
+		})
+
+	def test_destroy(self):
+		self.assertBudget(3, 'delete', reverse('order-detail', args=[self.pending.pk]))
+		self.assertFalse(OrderItem.objects.filter(order_id=self.pending.pk).exists())
+
+	def test_update_status(self):
+		self.assertBudget(3, 'patch', reverse('order-update-status', args=[self.pending.pk]), {'status': 'processing'})
+
+	def test_update_payment_status(self):
+		self.assertBudget(3, 'patch', reverse('order-update-payment-status', args=[self.pending.pk]), {'payment_status': 'paid'})
+
+	def test_invalid_status_transition(self):
+		url = reverse('order-update-status', args=[self.processing.pk])
+		with self.assertNumQueries(1):
+			response = self.client.patch(url, {'status': 'pending'}, format='json')
+		self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FastJSONTests(SimpleTestCase):
+	"""
+	Every test runs once per available backend, including none at all,
+	and compares the result with the DRF defaults.
+	"""
+	payload = {
+		'id': 1,
+		'subtotal': '1234.50',
+		'total_amount': Decimal('1534.50'),
+		'items': [
+			{'quantity': 3, 'unit_price': '0.01', 'total_price': Decimal('0.03')},
+			{'quantity': 1, 'unit_price': '99999999.99', 'total_price': Decimal('99999999.99')},
+		],
+		'created_at': datetime.datetime(2025, 12, 19, 8, 16, 1, 123456, tzinfo=ZoneInfo('Europe/Moscow')),
+		'paid_at': datetime.datetime(2025, 12, 19, 5, 16, tzinfo=datetime.timezone.utc),
+		'delivered_at': None,
+		'date': datetime.date(2025, 12, 19),
+		'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+		'customer_name': 'Иван \u2028 Петров',
+		'flags': [True, False],
+		'ratio': 0.1,
+	}
+
+	def renderer_backends(self):
+		backends = {'json': None}
+		if renderers.orjson is not None:
+			backends['orjson'] = renderers.orjson
+		for name, backend in backends.items():
+			with self.subTest(backend=name), mock.patch('orders.renderers.orjson', backend):
+				yield
+
+	def parser_backends(self):
+		backends = {'json': None}
+		if parsers.msgspec is not None:
+			backends['msgspec'] = parsers.msgspec.json.Decoder().decode
+		for name, backend in backends.items():
+			with self.subTest(backend=name), mock.patch('orders.parsers._loads', backend):
+				yield
+
+	def assertSameRender(self, data, media_type=None):
+		self.assertEqual(
+			FastJSONRenderer().render(data, media_type),
+			JSONRenderer().render(data, media_type),
+		)
+
+	def test_render_matches_json_renderer(self):
+		for _ in self.renderer_backends():
+			for media_type in ['application/json', 'application/json; indent=4']:
+				self.assertSameRender(self.payload, media_type)
+
+	def test_render_falls_back_for_unsupported_data(self):
+		for _ in self.renderer_backends():
+			self.assertSameRender({1: 'a', None: 'b', 'big': 2 ** 70})
+
+	def test_render_rejects_non_finite_numbers(self):
+		for _ in self.renderer_backends():
+			for value in [Decimal('NaN'), Decimal('Infinity'), float('inf'), float('-inf'), float('nan')]:
+				for data in [{'x': value}, {'x': None, 'items': [{'y': value}]}]:
+					with self.assertRaisesMessage(ValueError, 'Out of range float values are not JSON compliant'):
+						FastJSONRenderer().render(data)
+
+	def test_parse_matches_json_parser(self):
+		body = JSONRenderer().render({**self.payload, 'big': 2 ** 70, 'huge': 10 ** 40}) + b' '
+		for _ in self.parser_backends():
+			parsed = FastJSONParser().parse(io.BytesIO(body))
+			self.assertEqual(parsed, JSONParser().parse(io.BytesIO(body)))
+			self.assertEqual((parsed['big'], parsed['huge']), (2 ** 70, 10 ** 40))
+
+	def test_parse_rejects_invalid_json(self):
+		for _ in self.parser_backends():
+			for body in [b'{"a": ', b'NaN', b'{"a": Infinity}']:
+				with self.assertRaises(ParseError):
+					FastJSONParser().parse(io.BytesIO(body))
+
+
+ORDER_DATA = {
+	'order_number': 'ORD-IMPORT1',
+	'customer_id': '7',
+	'customer_email': 'customer@example.com',
+	'customer_name': 'Customer',
+	'delivering_address': 'Lenina 1',
+	'delivering_city': 'Moscow',
+}
+
+
+class ImportOrdersParsingTests(SimpleTestCase):
+	def test_read_csv_groups_adjacent_rows(self):
+		stream = io.StringIO(
+			'order_number,customer_name,notes,item_product_id,item_quantity\n'
+			'A,Anna,,1,2\n'
+			'A,Anna,,2,1\n'
+			'B,Boris,call first,,\n'
+			'C,Clara,,3,5\n'
+		)
+		self.assertEqual(list(read_csv(stream)), [
+			({'order_number': 'A', 'customer_name': 'Anna'},
+			 [{'product_id': '1', 'quantity': '2'}, {'product_id': '2', 'quantity': '1'}]),
+			({'order_number': 'B', 'customer_name': 'Boris', 'notes': 'call first'}, []),
+			({'order_number': 'C', 'customer_name': 'Clara'}, [{'product_id': '3', 'quantity': '5'}]),
+		])
+
+	def test_read_ndjson(self):
+		stream = io.StringIO(
+			'{"order_number": "A", "delivering_cost": 1.10, "items": [{"unit_price": 0.1}]}\n'
+			'\n'
+			'{"order_number": "B"}\n'
+		)
+		records = list(read_ndjson(stream))
+		self.assertEqual(records, [
+			({'order_number': 'A', 'delivering_cost': Decimal('1.10')}, [{'unit_price': Decimal('0.1')}]),
+			({'order_number': 'B'}, []),
+		])
+
+	def test_read_csv_reports_rows_with_extra_fields(self):
+		stream = io.StringIO(
+			'order_number,customer_name\n'
+			'A,Anna\n'
+			'B,Boris,extra\n'
+			'C,Clara\n'
+		)
+		first, invalid, last = read_csv(stream)
+		self.assertEqual(first, ({'order_number': 'A', 'customer_name': 'Anna'}, []))
+		self.assertIsInstance(invalid, InvalidRecord)
+		self.assertEqual(str(invalid), 'line 3: more fields than in the header')
+		self.assertEqual(last, ({'order_number': 'C', 'customer_name': 'Clara'}, []))
+
+	def test_read_ndjson_reports_malformed_lines(self):
+		records = list(read_ndjson(io.StringIO('{"order_number": \n[1, 2]\n{"order_number": "A"}\n')))
+		self.assertEqual(len(records), 3)
+		for line_number, record in enumerate(records[:2], start=1):
+			self.assertIsInstance(record, InvalidRecord)
+			self.assertTrue(str(record).startswith(f'line {line_number}: '))
+		self.assertEqual(records[2], ({'order_number': 'A'}, []))
+
+	def test_build_order(self):
+		order = build_order({**ORDER_DATA, 'created_at': '2025-12-19 08:16:00', 'delivering_cost': '3.50'})
+		self.assertEqual(order.customer_id, 7)
+		self.assertEqual(order.delivering_cost, Decimal('3.50'))
+		self.assertEqual(order.status, 'pending')
+		self.assertEqual(order.delivering_country, 'Russia')
+		self.assertFalse(timezone.is_naive(order.created_at))
+		self.assertEqual(order.updated_at, order.created_at)
+
+	def test_build_order_rejects_invalid_data(self):
+		cases = [
+			{key: value for key, value in ORDER_DATA.items() if key != 'order_number'},
+			{**ORDER_DATA, 'unknown': '1'},
+			{**ORDER_DATA, 'customer_email': 'not an email'},
+			{**ORDER_DATA, 'status': 'shipped'},
+			{**ORDER_DATA, 'delivering_cost': '-1'},
+			{**ORDER_DATA, 'status': 'delivered', 'payment_status': 'pending'},
+			{**ORDER_DATA, 'customer_name': 'a\x00b'},
+			{**ORDER_DATA, 'notes': '\x00'},
+		]
+		for data in cases:
+			with self.subTest(data=data), self.assertRaises(ValidationError):
+				build_order(data)
+
+	def test_build_item(self):
+		item = build_item({'product_id': '1', 'product_name': 'Tea', 'quantity': '2', 'unit_price': '4.25'})
+		self.assertEqual((item.quantity, item.unit_price), (2, Decimal('4.25')))
+
+		for data in [
+			{'product_id': '1', 'product_name': 'Tea', 'quantity': '0', 'unit_price': '4.25'},
+			{'product_id': '1', 'product_name': 'Tea', 'quantity': '1', 'unit_price': '-1'},
+			{'product_id': '1', 'product_name': 'Tea', 'quantity': '1'},
+			{'product_id': '1', 'product_name': 'Tea', 'quantity': '1', 'unit_price': '1', 'colour': 'red'},
+			{'product_id': '1', 'product_name': 'T\x00a', 'quantity': '1', 'unit_price': '1'},
+		]:
+			with self.subTest(data=data), self.assertRaises(ValidationError):
+				build_item(data)
+
+	def test_validate_subtotal(self):
+		item = build_item({'product_id': '1', 'product_name': 'Tea', 'quantity': '1000', 'unit_price': '99999999.99'})
+		self.assertEqual(validate_subtotal([]), Decimal(0))
+		with self.assertRaises(ValidationError):
+			validate_subtotal([item])
+
+	def test_validate_order_state(self):
+		for status_, payment_status in [
+			('pending', 'pending'), ('processing', 'paid'), ('delivered', 'paid'),
+			('delivered', 'refunded'), ('cancelled', 'failed'), ('refunded', 'refunded'),
+		]:
+			with self.subTest(status=status_, payment_status=payment_status):
+				self.assertTrue(validate_order_state(status_, payment_status))
+
+		for status_, payment_status in [
+			('shipped', 'pending'), ('pending', 'unknown'), ('delivered', 'pending'),
+			('cancelled', 'paid'), ('refunded', 'paid'),
+		]:
+			with self.subTest(status=status_, payment_status=payment_status):
+				with self.assertRaises(ValidationError):
+					validate_order_state(status_, payment_status)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'import_orders requires PostgreSQL')
+class ImportOrdersCommandTests(TestCase):
+	def setUp(self):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		self.path = os.path.join(tmp.name, 'orders.ndjson')
+		self.records = [
+			{
+				**ORDER_DATA,
+				'order_number': f'ORD-IMPORT{index}',
+				'items': [
+					{'product_id': product_id, 'product_name': f'Product {product_id}',
+					 'quantity': product_id, 'unit_price': f'{index}.25'}
+					for product_id in range(1, index % 3 + 1)
+				],
+			}
+			for index in range(7)
+		]
+
+	def write(self, records):
+		with open(self.path, 'w', encoding='utf-8') as f:
+			f.writelines(json.dumps(record) + '\n' for record in records)
+
+	def run_import(self, *args):
+		call_command('import_orders', self.path, '--chunk-size', '2', *args, stdout=io.StringIO(), stderr=io.StringIO())
+
+	def assertImported(self, indexes):
+		self.assertEqual(
+			sorted(Order.objects.values_list('order_number', flat=True)),
+			sorted(f'ORD-IMPORT{index}' for index in indexes),
+		)
+		for index in indexes:
+			order = Order.objects.get(order_number=f'ORD-IMPORT{index}')
+			expected = sum(
+				Decimal(item['quantity']) * Decimal(item['unit_price'])
+				for item in self.records[index]['items']
+			)
+			self.assertEqual(order.subtotal, expected)
+			self.assertEqual(
+				list(order.items.values_list('product_id', flat=True)),
+				[item['product_id'] for item in self.records[index]['items']],
+			)
+
+	def test_import_over_several_chunks(self):
+		self.write(self.records)
+		self.run_import()
+
+		self.assertImported(range(7))
+		self.assertEqual(OrderItem.objects.count(), sum(len(r['items']) for r in self.records))
+		self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+	def test_existing_orders_are_skipped(self):
+		self.write(self.records[:3])
+		self.run_import()
+		self.write(self.records)
+		self.run_import()
+
+		self.assertImported(range(7))
+		self.assertEqual(OrderItem.objects.count(), sum(len(r['items']) for r in self.records))
+
+	def test_resume_after_invalid_record(self):
+		broken = [*self.records]
+		broken[4] = {**broken[4], 'customer_email': 'broken'}
+		self.write(broken)
+		with self.assertRaisesMessage(CommandError, 'Order #5'):
+			self.run_import()
+
+		self.assertImported(range(4))
+		with open(f'{self.path}.checkpoint', encoding='utf-8') as f:
+			self.assertEqual(json.load(f), {'orders': 4})
+
+		self.write(self.records)
+		self.run_import('--resume')
+		self.assertImported(range(7))
+
+	def test_skip_invalid(self):
+		broken = [*self.records]
+		broken[1] = {**broken[1], 'status': 'delivered'}
+		broken[5] = {
+			**broken[5],
+			'items': [{'product_id': 1, 'product_name': 'Gold', 'quantity': 1000, 'unit_price': '99999999.99'}],
+		}
+		broken[3] = {**broken[3], 'customer_name': 'a\x00b'}
+		self.write(broken)
+		self.run_import('--skip-invalid')
+
+		self.assertImported([0, 2, 4, 6])
+
+	def test_skip_invalid_covers_malformed_lines(self):
+		self.write(self.records)
+		with open(self.path, encoding='utf-8') as f:
+			lines = f.readlines()
+		lines[2] = '{"order_number": \n'
+		with open(self.path, 'w', encoding='utf-8') as f:
+			f.writelines(lines)
+
+		with self.assertRaisesMessage(CommandError, 'Order #3: malformed input, line 3'):
+			self.run_import()
+		self.run_import('--resume', '--skip-invalid')
+
+		self.assertImported([0, 1, 3, 4, 5, 6])
+
+	def test_non_adjacent_order_is_reported_as_duplicate(self):
+		split = {**self.records[1], 'items': [{'product_id': 9, 'product_name': 'Late', 'quantity': 1, 'unit_price': '1.00'}]}
+		self.write([*self.records, split])
+		with self.assertRaisesMessage(CommandError, 'Order #8 (ORD-IMPORT1): Duplicate order_number ORD-IMPORT1 in input'):
+			self.run_import()
+
+		# A resume must still know about the orders committed before it.
+		self.run_import('--resume', '--skip-invalid')
+		self.assertImported(range(7))
+
+	def test_missing_file(self):
+		with self.assertRaisesMessage(CommandError, 'Cannot open'):
+			call_command('import_orders', os.path.join(os.path.dirname(self.path), 'missing.ndjson'))
@@ -104,3 +104,25 @@ def validate_order_payment_status_transition(old_status, new_status):
 		)
 
 	return True
+
+
+def validate_order_state(status, payment_status):
+	if status not in ALLOWED_STATUSES:
+		raise ValidationError(f'Unknown order status: {status}')
+
+	if payment_status not in VALID_PAYMENT_TRANSITIONS:
+		raise ValidationError(f'Unknown payment status: {payment_status}')
+
+	if status == 'delivered':
+		reachable = {'paid', *VALID_PAYMENT_TRANSITIONS['paid']}
+	elif status in PAYMENT_STATUS_RULES:
+		reachable = set(PAYMENT_STATUS_RULES[status].values())
+	else:
+		reachable = VALID_PAYMENT_TRANSITIONS.keys()
+
+	if payment_status not in reachable:
+		raise ValidationError(
+			f'Order in status {status} cannot have payment status {payment_status}'
+		)
+
+	return True
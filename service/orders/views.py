@@ -4,7 +4,7 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import Order, OrderItem
+from .models import Order
 from .serializers import OrderSerializer, OrderPaymentStatusSerializer, OrderItemSerializer
 from .validators import update_order_status
 
@@ -18,11 +18,16 @@ class OrderViewSet(viewsets.ModelViewSet):
 	ordering_fields = ['created_at', 'updated_at']
 	ordering = ['-created_at']
 
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.action in ('list', 'retrieve'):
+			queryset = queryset.prefetch_related('items')
+		return queryset
+
 	@action(detail=True, methods=['get'])
 	def items(self, request, pk=None):
 		order = self.get_object()
-		items = OrderItem.objects.filter(order=order)
-		serializer = OrderItemSerializer(items, many=True)
+		serializer = OrderItemSerializer(order.items.all(), many=True)
 		return Response(serializer.data)
 
 	@action(detail=True, methods=['patch'], url_path='payment-status')